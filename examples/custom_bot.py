@@ -51,9 +51,18 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     logger.info("Starting local services bot")
 
     # 1. Vosk ASR
+    #
+    # If Vosk listens on a Unix domain socket on this machine, use a URI like
+    # "unix:///tmp/vosk.sock" instead to skip the TCP stack.
     stt = VoskSTTService(uri="ws://localhost:2700")
 
     # 2. Kyutai Pocket TTS
+    #
+    # LLM tokens are aggregated into sentences and each sentence is sent to
+    # Pocket TTS as soon as it's complete, so audio for the first sentence is
+    # generated while the LLM is still streaming the rest of the response. On
+    # interruptions the in-flight request is cancelled, which closes the HTTP
+    # response and frees the Pocket TTS server.
     tts = PocketTTSService(base_url="http://localhost:8000")
 
     # 3. LMStudio LLM (OpenAI compatible)
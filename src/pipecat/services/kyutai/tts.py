@@ -6,25 +6,78 @@
 
 """Kyutai Pocket TTS service implementation."""
 
-from typing import AsyncGenerator, Optional
+import asyncio
+import struct
+import urllib.parse
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Tuple
 
 import aiohttp
 from loguru import logger
 
 from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
     ErrorFrame,
     Frame,
+    StartFrame,
+    TTSAudioRawFrame,
     TTSStartedFrame,
     TTSStoppedFrame,
 )
 from pipecat.services.tts_service import TTSService
 from pipecat.utils.tracing.service_decorators import traced_tts
 
+# Progressive emission schedule (in milliseconds). The first frames are small so
+# playback can start as soon as possible, then the frame size doubles until it
+# settles at the last value.
+PROGRESSIVE_SCHEDULE_MS = (20, 40, 80, 160, 200)
+
+# Consumed bytes are only dropped from the stream buffer once they exceed this
+# size, so we don't move memory around on every emitted frame.
+COMPACT_THRESHOLD_BYTES = 64 * 1024
+
+# Maximum number of audio frames buffered between the HTTP reader and the frames
+# pushed downstream. The HTTP response is only throttled when downstream falls
+# behind by more than this.
+AUDIO_QUEUE_SIZE = 3
+
+
+def _parse_wav_header(buffer: bytearray) -> Optional[Tuple[int, Optional[int]]]:
+    """Parse the header of a buffer holding the beginning of a WAV stream.
+
+    Returns a tuple with the offset where the PCM samples start and the sample
+    rate from the `fmt ` chunk (if any), or None if more bytes are needed to
+    locate the `data` chunk. Buffers that don't start with a RIFF header are
+    considered raw PCM.
+    """
+    if len(buffer) < 4:
+        return None
+    if buffer[:4] != b"RIFF":
+        return (0, None)
+
+    # Walk the RIFF sub-chunks ("fmt ", "LIST", ...) until we find "data".
+    sample_rate = None
+    offset = 12
+    while offset + 8 <= len(buffer):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", buffer, offset)
+        if chunk_id == b"data":
+            return (offset + 8, sample_rate)
+        if chunk_id == b"fmt " and offset + 16 <= len(buffer):
+            # Audio format (2 bytes), channels (2 bytes), sample rate (4 bytes).
+            (sample_rate,) = struct.unpack_from("<I", buffer, offset + 12)
+        # Sub-chunks are word aligned.
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
 
 class PocketTTSService(TTSService):
     """Kyutai Pocket TTS service implementation.
 
-    Interacts with the pocket-tts HTTP server.
+    Interacts with the pocket-tts HTTP server. Each text aggregation (a sentence
+    by default) is synthesized with one POST request to `/tts`. Requests are
+    issued one at a time since `TTSService` processes text frames in order, and
+    they all reuse the same keep-alive connection, so short back-to-back
+    sentences don't pay for a new connection each time.
     """
 
     def __init__(
@@ -33,60 +86,165 @@ class PocketTTSService(TTSService):
         base_url: str = "http://localhost:8000",
         voice_id: Optional[str] = None,
         sample_rate: int = 24000,
+        progressive: bool = True,
         **kwargs,
     ):
+        """Initialize the Pocket TTS service.
+
+        Args:
+            base_url: Base URL of the pocket-tts HTTP server.
+            voice_id: Voice to use for synthesis.
+            sample_rate: Output sample rate of the generated audio.
+            progressive: Whether to emit small audio frames first and grow them
+                progressively (see `PROGRESSIVE_SCHEDULE_MS`) instead of waiting
+                for a full `chunk_size` before pushing audio.
+            **kwargs: Additional arguments passed to the parent TTSService.
+        """
         super().__init__(sample_rate=sample_rate, **kwargs)
         self._base_url = base_url.rstrip("/")
+        self._tts_url = f"{self._base_url}/tts"
+        self._form_headers = {"Content-Type": "application/x-www-form-urlencoded"}
         self._voice_id = voice_id
+        self._progressive = progressive
         self._session: Optional[aiohttp.ClientSession] = None
 
     def can_generate_metrics(self) -> bool:
         return True
 
-    async def start(self, frame_provider):
-        await super().start(frame_provider)
-        self._session = aiohttp.ClientSession()
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        # A single keep-alive connection pool is used for the lifetime of the
+        # service, so consecutive requests reuse the same socket.
+        connector = aiohttp.TCPConnector(limit=4, ttl_dns_cache=300, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(connector=connector)
 
-    async def stop(self):
+    async def stop(self, frame: EndFrame):
+        await super().stop(frame)
+        await self._close_session()
+
+    async def cancel(self, frame: CancelFrame):
+        """Cancel the Pocket TTS service and close the HTTP session.
+
+        Args:
+            frame: The cancel frame.
+        """
+        await super().cancel(frame)
+        await self._close_session()
+
+    async def _close_session(self):
         if self._session:
             await self._session.close()
             self._session = None
-        await super().stop()
+
+    def _frame_schedule(self) -> List[int]:
+        """Frame sizes in bytes (16-bit mono), the last one repeats until the end."""
+        if self._progressive:
+            return [int(self.sample_rate * ms / 1000) * 2 for ms in PROGRESSIVE_SCHEDULE_MS]
+        return [self.chunk_size]
+
+    async def _stream_wav_audio_frames(
+        self, iterator: AsyncIterator[bytes]
+    ) -> AsyncGenerator[Frame, None]:
+        schedule = self._frame_schedule()
+        step = 0
+        buffer = bytearray()
+        offset = 0
+        pcm_start: Optional[int] = None
+
+        async for chunk in iterator:
+            buffer += chunk
+
+            # The WAV header is only parsed once, at the beginning of the stream.
+            if pcm_start is None:
+                header = _parse_wav_header(buffer)
+                if header is None:
+                    continue
+                pcm_start, wav_sample_rate = header
+                if wav_sample_rate and wav_sample_rate != self.sample_rate:
+                    logger.warning(
+                        "{}: Pocket TTS audio sample rate ({}) doesn't match the service "
+                        "sample rate ({})",
+                        self,
+                        wav_sample_rate,
+                        self.sample_rate,
+                    )
+                offset = pcm_start
+
+            size = schedule[step]
+            while len(buffer) - offset >= size:
+                audio = bytes(memoryview(buffer)[offset : offset + size])
+                offset += size
+                yield TTSAudioRawFrame(audio, self.sample_rate, 1)
+                step = min(step + 1, len(schedule) - 1)
+                size = schedule[step]
+
+            if offset > COMPACT_THRESHOLD_BYTES:
+                del buffer[:offset]
+                offset = 0
+
+        # Flush the tail of the stream.
+        if pcm_start is not None and len(buffer) > offset:
+            audio = bytes(memoryview(buffer)[offset:])
+            # Make sure we don't need an extra padding byte.
+            if len(audio) % 2 == 1:
+                audio += b"\x00"
+            yield TTSAudioRawFrame(audio, self.sample_rate, 1)
+
+    async def _receive_audio_frames(self, response: aiohttp.ClientResponse, queue: asyncio.Queue):
+        try:
+            async for frame in self._stream_wav_audio_frames(response.content.iter_any()):
+                await queue.put(frame)
+        except Exception as e:
+            logger.error("Pocket TTS exception: {}", e)
+            await queue.put(ErrorFrame(f"Pocket TTS exception: {e}"))
+        # Signal the end of the stream.
+        await queue.put(None)
 
     @traced_tts
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
-        if not self._session or self._session.closed:
-            self._session = aiohttp.ClientSession()
+        # Let loguru format the message only if the level is enabled.
+        logger.debug("Generating TTS with Pocket TTS: [{}]", text)
 
-        logger.debug(f"Generating TTS with Pocket TTS: [{text}]")
-        
-        # Use /tts endpoint with multipart/form-data
-        url = f"{self._base_url}/tts"
-        data = aiohttp.FormData()
-        data.add_field("text", text)
+        # The text is the only form field, so the url-encoded body is built by
+        # hand instead of going through aiohttp.FormData.
+        body = b"text=" + urllib.parse.quote_plus(text).encode()
 
         try:
+            # The session lives between start() and stop(), which are always
+            # called before and after any TTS request.
+            assert self._session is not None, f"{self} has not been started"
+
             await self.start_ttfb_metrics()
-            async with self._session.post(url, data=data) as response:
+            async with self._session.post(
+                self._tts_url, data=body, headers=self._form_headers
+            ) as response:
                 if response.status != 200:
                     error_text = await response.text()
-                    logger.error(f"Pocket TTS error: {response.status} - {error_text}")
+                    logger.error("Pocket TTS error: {} - {}", response.status, error_text)
                     yield ErrorFrame(f"Pocket TTS error: {response.status}")
                     return
 
                 await self.start_tts_usage_metrics(text)
                 yield TTSStartedFrame()
 
-                # Pocket TTS returns a WAV file. We need to strip the header.
-                async for frame in self._stream_audio_frames_from_iterator(
-                    response.content.iter_chunked(self.chunk_size),
-                    strip_wav_header=True
-                ):
-                    await self.stop_ttfb_metrics()
-                    yield frame
+                # Pocket TTS returns a WAV file, the header is stripped while
+                # reading. The response is read in a separate task so we keep
+                # receiving audio while frames are being pushed downstream.
+                queue: asyncio.Queue = asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
+                receive_task = self.create_task(self._receive_audio_frames(response, queue))
+                try:
+                    first_frame = True
+                    while (frame := await queue.get()) is not None:
+                        # TTFB is only measured until the first audio frame.
+                        if first_frame and isinstance(frame, TTSAudioRawFrame):
+                            await self.stop_ttfb_metrics()
+                            first_frame = False
+                        yield frame
+                finally:
+                    await self.cancel_task(receive_task)
 
         except Exception as e:
-            logger.error(f"Pocket TTS exception: {e}")
+            logger.error("Pocket TTS exception: {}", e)
             yield ErrorFrame(f"Pocket TTS exception: {e}")
         finally:
             await self.stop_ttfb_metrics()
@@ -6,55 +6,121 @@
 
 """Vosk Speech-to-Text service implementation."""
 
-import asyncio
-import json
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, List, Optional
 
 from loguru import logger
 
 from pipecat.frames.frames import (
-    ErrorFrame,
+    AudioRawFrame,
+    CancelFrame,
+    EndFrame,
     Frame,
     InterimTranscriptionFrame,
+    StartFrame,
     TranscriptionFrame,
+    VADUserStoppedSpeakingFrame,
 )
-from pipecat.services.stt_service import STTService
-from pipecat.services.websocket_service import WebsocketService
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.stt_service import WebsocketSTTService
 from pipecat.transcriptions.language import Language
 from pipecat.utils.time import time_now_iso8601
 from pipecat.utils.tracing.service_decorators import traced_stt
 
+try:
+    import orjson
+    from websockets.asyncio.client import connect as websocket_connect
+    from websockets.asyncio.client import unix_connect as websocket_unix_connect
+    from websockets.protocol import State
+except ModuleNotFoundError as e:
+    logger.error(f"Exception: {e}")
+    logger.error("In order to use Vosk, you need to `pip install pipecat-ai[vosk]`.")
+    raise Exception(f"Missing module: {e}")
 
-class VoskSTTService(STTService, WebsocketService):
+# Incoming audio is accumulated until we have this much before sending it to
+# Vosk, which reduces the number of websocket messages (Vosk processes audio
+# in larger windows anyway).
+SEND_BUFFER_SECS = 0.06
+
+# URIs starting with this scheme connect through a Unix domain socket (e.g.
+# `unix:///tmp/vosk.sock`), which is cheaper when Vosk runs on the same host.
+UNIX_SCHEME = "unix://"
+
+
+class VoskSTTService(WebsocketSTTService):
     """Vosk STT service implementation using WebSockets."""
 
     def __init__(
         self,
         *,
         uri: str = "ws://localhost:2700",
-        sample_rate: int = 16000,
+        sample_rate: Optional[int] = None,
         language: Language = Language.EN,
         **kwargs,
     ):
-        STTService.__init__(self, **kwargs)
-        WebsocketService.__init__(self, **kwargs)
+        """Initialize the Vosk STT service.
+
+        Args:
+            uri: Websocket URI of the Vosk server. Use `unix:///path/to/socket`
+                to connect through a Unix domain socket.
+            sample_rate: Audio sample rate. If None, will be determined from the
+                start frame.
+            language: Language of the transcriptions.
+            **kwargs: Additional arguments passed to the parent WebsocketSTTService.
+        """
+        super().__init__(sample_rate=sample_rate, **kwargs)
         self._uri = uri
-        self._sample_rate = sample_rate
         self._language = language
         self._receive_task = None
+        # Audio chunks waiting to be sent, joined into a single message on send.
+        self._send_buffer: List[bytes] = []
+        self._send_buffer_len = 0
+        self._send_buffer_size = 0
+        self._config_message = ""
 
     def can_generate_metrics(self) -> bool:
         return True
 
+    async def _connect(self):
+        await super()._connect()
+
+        try:
+            await self._connect_websocket()
+        except Exception as e:
+            # Start the receive task anyway so it keeps trying to reconnect
+            # instead of staying deaf forever. It reports its own failures.
+            await self.push_error(error_msg=f"Unable to connect to Vosk: {e}", exception=e)
+
+        if not self._receive_task:
+            self._receive_task = self.create_task(self._receive_task_handler(self._report_error))
+
+    async def _disconnect(self):
+        await super()._disconnect()
+
+        if self._receive_task:
+            await self.cancel_task(self._receive_task)
+            self._receive_task = None
+
+        await self._disconnect_websocket()
+
     async def _connect_websocket(self):
-        import websockets
         try:
             logger.debug(f"Connecting to Vosk at {self._uri}")
-            self._websocket = await websockets.connect(self._uri)
-            # Initialize Vosk with sample rate
-            await self._websocket.send(json.dumps({"config": {"sample_rate": self._sample_rate}}))
+            # PCM audio doesn't compress, so skip per-message deflate.
+            options = {
+                "compression": None,
+                "max_size": 2**20,
+                "write_limit": 2**20,
+                "open_timeout": 5,
+            }
+            if self._uri.startswith(UNIX_SCHEME):
+                path = self._uri[len(UNIX_SCHEME) :]
+                self._websocket = await websocket_unix_connect(path, **options)
+            else:
+                self._websocket = await websocket_connect(self._uri, **options)
+            # Initialize Vosk with sample rate.
+            await self._websocket.send(self._config_message)
         except Exception as e:
-            logger.error(f"Error connecting to Vosk: {e}")
+            logger.error(f"{self} unable to connect to Vosk: {e}")
             raise
 
     async def _disconnect_websocket(self):
@@ -63,63 +129,134 @@ class VoskSTTService(STTService, WebsocketService):
             self._websocket = None
 
     async def _receive_messages(self):
-        async for message in self._websocket:
-            data = json.loads(message)
-            if "text" in data:
-                text = data["text"]
-                if text:
-                    frame = TranscriptionFrame(
+        if not self._websocket:
+            raise ConnectionError("Not connected to Vosk")
+
+        while True:
+            # Get the raw bytes, orjson parses them without decoding to str first.
+            message = await self._websocket.recv(decode=False)
+            data = orjson.loads(message)
+
+            # Vosk sends either a final result ("text") or a partial one ("partial").
+            text = data.get("text")
+            if text:
+                await self.push_frame(
+                    TranscriptionFrame(
                         text=text,
                         user_id=self._user_id,
                         timestamp=time_now_iso8601(),
                         language=self._language,
                     )
-                    await self.push_frame(frame)
-            elif "partial" in data:
-                partial = data["partial"]
-                if partial:
-                    frame = InterimTranscriptionFrame(
+                )
+                await self._handle_transcription(text, True, self._language)
+                await self.stop_ttfb_metrics()
+                await self.stop_processing_metrics()
+                continue
+
+            partial = data.get("partial")
+            if partial:
+                await self.push_frame(
+                    InterimTranscriptionFrame(
                         text=partial,
                         user_id=self._user_id,
                         timestamp=time_now_iso8601(),
                         language=self._language,
                     )
-                    await self.push_frame(frame)
+                )
 
-    @traced_stt
     async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
-        if not self._websocket:
-            await self._connect()
+        """Send audio data to Vosk.
 
-        try:
-            await self.start_processing_metrics()
+        Audio frames are sent directly from `process_audio_frame()`, this is
+        only kept for API compatibility.
+
+        Args:
+            audio: Raw audio bytes to transcribe.
+
+        Yields:
+            Frame: None (transcription results come from the websocket).
+        """
+        await self._buffer_audio(audio)
+        yield None
+
+    async def process_audio_frame(self, frame: AudioRawFrame, direction: FrameDirection):
+        """Buffer and send an audio frame to Vosk.
+
+        This bypasses `run_stt()` so we don't create and iterate a generator for
+        every audio frame. Transcriptions are pushed from `_receive_messages()`.
+
+        Args:
+            frame: The audio frame to process.
+            direction: The direction of frame processing.
+        """
+        if self._muted:
+            return
+
+        # UserAudioRawFrame contains a user_id (e.g. Daily, Livekit)
+        self._user_id = getattr(frame, "user_id", "")
+
+        if not frame.audio:
+            return
+
+        await self._buffer_audio(frame.audio)
+
+    @traced_stt
+    async def _handle_transcription(
+        self, transcript: str, is_final: bool, language: Optional[Language] = None
+    ):
+        """Handle a transcription result with tracing."""
+        pass
+
+    async def _buffer_audio(self, audio: bytes):
+        self._send_buffer.append(audio)
+        self._send_buffer_len += len(audio)
+        if self._send_buffer_len >= self._send_buffer_size:
+            await self._send_buffered_audio()
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        """Process frames, flushing audio and starting metrics when the user stops speaking.
+
+        Args:
+            frame: The frame to process.
+            direction: The direction of frame processing.
+        """
+        await super().process_frame(frame, direction)
+
+        # Don't keep the end of the utterance waiting in the buffer. Vosk sends
+        # the final result after that, so measure from here.
+        if isinstance(frame, VADUserStoppedSpeakingFrame):
             await self.start_ttfb_metrics()
+            await self.start_processing_metrics()
+            await self._send_buffered_audio()
 
-            await self._websocket.send(audio)
-            
-            # We need to yield something to keep the generator alive if needed,
-            # but actually STTService.process_frame expects a generator that yields frames.
-            # Since we push frames asynchronously in _receive_messages, we can just return.
-            if False:
-                yield
+    async def _send_buffered_audio(self):
+        try:
+            if self._send_buffer and self._websocket and self._websocket.state is State.OPEN:
+                await self._websocket.send(b"".join(self._send_buffer))
         except Exception as e:
-            logger.error(f"Vosk STT error: {e}")
-            yield ErrorFrame(f"Vosk STT error: {e}")
+            await self.push_error(error_msg=f"Vosk STT error: {e}", exception=e)
         finally:
-            await self.stop_ttfb_metrics()
-            await self.stop_processing_metrics()
+            self._send_buffer.clear()
+            self._send_buffer_len = 0
 
-    async def start(self, frame_provider):
-        await super().start(frame_provider)
-        # Start the websocket receive task
-        self._receive_task = asyncio.create_task(self._receive_task_handler(self.push_error))
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        self._send_buffer_size = int(self.sample_rate * 2 * SEND_BUFFER_SECS)
+        # The config is the same for every (re)connection. It needs to be sent
+        # as a text message, otherwise Vosk would take it as audio.
+        self._config_message = orjson.dumps({"config": {"sample_rate": self.sample_rate}}).decode()
+        await self._connect()
 
-    def push_error(self, error_frame):
-        # Helper to push error frames from the receive task
-        asyncio.create_task(self.push_frame(error_frame))
+    async def stop(self, frame: EndFrame):
+        await super().stop(frame)
+        await self._send_buffered_audio()
+        await self._disconnect()
 
-    async def stop(self):
-        if self._receive_task:
-            self._receive_task.cancel()
+    async def cancel(self, frame: CancelFrame):
+        """Cancel the Vosk service and close the websocket connection.
+
+        Args:
+            frame: The cancel frame.
+        """
+        await super().cancel(frame)
         await self._disconnect()
-        await super().stop()
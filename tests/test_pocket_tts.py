@@ -0,0 +1,281 @@
+#
+# Copyright (c) 2024-2026, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Tests for PocketTTSService."""
+
+import asyncio
+import struct
+
+import pytest
+from aiohttp import web
+
+from pipecat.frames.frames import (
+    AggregatedTextFrame,
+    ErrorFrame,
+    InterruptionFrame,
+    TTSAudioRawFrame,
+    TTSSpeakFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    TTSTextFrame,
+)
+from pipecat.services.kyutai.tts import PocketTTSService
+from pipecat.tests.utils import SleepFrame, run_test
+
+SAMPLE_RATE = 24000
+
+
+def wav_header(sample_rate: int) -> bytes:
+    """Build a streaming WAV header (unknown data size) for 16-bit mono PCM."""
+    fmt = struct.pack("<HHIIHH", 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0xFFFFFFFF)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_progressive(aiohttp_client):
+    """Test that the WAV header is stripped and frames grow progressively."""
+    # 20ms, 40ms, 80ms, 160ms, 200ms, 200ms and a 10ms tail.
+    num_samples = int(SAMPLE_RATE * 0.71)
+    pcm = b"\x01\x00" * num_samples
+
+    async def handler(request):
+        form = await request.post()
+        assert form["text"] == "Hello world."
+
+        resp = web.StreamResponse(status=200, headers={"Content-Type": "audio/wav"})
+        await resp.prepare(request)
+        # Split the header across writes to make sure it's parsed incrementally.
+        data = wav_header(SAMPLE_RATE) + pcm
+        for i in range(0, len(data), 1000):
+            await resp.write(data[i : i + 1000])
+            await asyncio.sleep(0)
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE)
+
+    expected_down_frames = (
+        [AggregatedTextFrame, TTSStartedFrame]
+        + [TTSAudioRawFrame] * 7
+        + [TTSStoppedFrame, TTSTextFrame]
+    )
+
+    frames_received = await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Hello world.")],
+        expected_down_frames=expected_down_frames,
+    )
+    audio_frames = [f for f in frames_received[0] if isinstance(f, TTSAudioRawFrame)]
+    assert [f.num_frames for f in audio_frames] == [480, 960, 1920, 3840, 4800, 4800, 240]
+    assert b"".join(f.audio for f in audio_frames) == pcm
+    for frame in audio_frames:
+        assert frame.sample_rate == SAMPLE_RATE
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_header_sample_rate_mismatch(aiohttp_client):
+    """Test that audio is split correctly when the WAV header has another sample rate."""
+    num_samples = int(SAMPLE_RATE * 0.71)
+    pcm = b"\x01\x00" * num_samples
+
+    # A 16kHz header with an extra chunk between "fmt " and "data".
+    header = wav_header(16000)
+    header = header[:36] + b"LIST" + struct.pack("<I", 4) + b"INFO" + header[36:]
+
+    async def handler(request):
+        resp = web.StreamResponse(status=200, headers={"Content-Type": "audio/wav"})
+        await resp.prepare(request)
+        data = header + pcm
+        for i in range(0, len(data), 1000):
+            await resp.write(data[i : i + 1000])
+            await asyncio.sleep(0)
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE)
+
+    expected_down_frames = (
+        [AggregatedTextFrame, TTSStartedFrame]
+        + [TTSAudioRawFrame] * 7
+        + [TTSStoppedFrame, TTSTextFrame]
+    )
+
+    frames_received = await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Hello world.")],
+        expected_down_frames=expected_down_frames,
+    )
+    audio_frames = [f for f in frames_received[0] if isinstance(f, TTSAudioRawFrame)]
+    # Frames follow the service sample rate, not the one in the header.
+    assert [f.num_frames for f in audio_frames] == [480, 960, 1920, 3840, 4800, 4800, 240]
+    assert b"".join(f.audio for f in audio_frames) == pcm
+    for frame in audio_frames:
+        assert frame.sample_rate == SAMPLE_RATE
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_not_progressive(aiohttp_client):
+    """Test that frames are `chunk_size` long when progressive mode is disabled."""
+    num_samples = int(SAMPLE_RATE * 0.71)
+    pcm = b"\x01\x00" * num_samples
+
+    async def handler(request):
+        return web.Response(body=wav_header(SAMPLE_RATE) + pcm, content_type="audio/wav")
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE, progressive=False)
+
+    frames_received = await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Hello world.")],
+        expected_down_frames=[
+            AggregatedTextFrame,
+            TTSStartedFrame,
+            TTSAudioRawFrame,
+            TTSAudioRawFrame,
+            TTSStoppedFrame,
+            TTSTextFrame,
+        ],
+    )
+    audio_frames = [f for f in frames_received[0] if isinstance(f, TTSAudioRawFrame)]
+    # chunk_size is 0.5 seconds of audio.
+    assert [f.num_frames for f in audio_frames] == [12000, 5040]
+    assert b"".join(f.audio for f in audio_frames) == pcm
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_error(aiohttp_client):
+    """Test that a non-200 response is reported with an ErrorFrame."""
+
+    async def handler(_request):
+        return web.Response(status=500, text="Internal error")
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE)
+
+    frames_received = await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Error case.")],
+        expected_down_frames=[AggregatedTextFrame, TTSStoppedFrame, TTSTextFrame],
+        expected_up_frames=[ErrorFrame],
+    )
+    assert "500" in frames_received[1][0].error
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_stream_error(aiohttp_client):
+    """Test that a stream failing halfway is reported and the turn still stops."""
+    # 20ms and 40ms frames worth of audio.
+    pcm = b"\x01\x00" * 1440
+
+    async def handler(request):
+        resp = web.StreamResponse(status=200, headers={"Content-Type": "audio/wav"})
+        await resp.prepare(request)
+        await resp.write(wav_header(SAMPLE_RATE) + pcm)
+        # Drop the connection without finishing the response.
+        request.transport.close()
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE)
+
+    frames_received = await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Hello world.")],
+        expected_down_frames=[
+            AggregatedTextFrame,
+            TTSStartedFrame,
+            TTSAudioRawFrame,
+            TTSAudioRawFrame,
+            TTSStoppedFrame,
+            TTSTextFrame,
+        ],
+        expected_up_frames=[ErrorFrame],
+    )
+    audio_frames = [f for f in frames_received[0] if isinstance(f, TTSAudioRawFrame)]
+    assert b"".join(f.audio for f in audio_frames) == pcm
+    assert "Pocket TTS exception" in frames_received[1][0].error
+
+
+@pytest.mark.asyncio
+async def test_run_pocket_tts_interruption(aiohttp_client):
+    """Test that an interruption cancels the audio reader of a slow stream."""
+    disconnected = asyncio.Event()
+
+    async def handler(request):
+        resp = web.StreamResponse(status=200, headers={"Content-Type": "audio/wav"})
+        await resp.prepare(request)
+        await resp.write(wav_header(SAMPLE_RATE))
+        try:
+            # 20ms of audio every 50ms, for far longer than the test runs.
+            for _ in range(200):
+                await resp.write(b"\x01\x00" * 480)
+                await asyncio.sleep(0.05)
+        except (asyncio.CancelledError, ConnectionResetError):
+            disconnected.set()
+            raise
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/tts", handler)
+    client = await aiohttp_client(app)
+    base_url = str(client.make_url("")).rstrip("/")
+
+    tts_service = PocketTTSService(base_url=base_url, sample_rate=SAMPLE_RATE)
+
+    # Keep track of the tasks created by the service to check how they ended.
+    tasks = []
+    create_task = tts_service.create_task
+
+    def record_task(coroutine, name=None):
+        task = create_task(coroutine, name)
+        tasks.append(task)
+        return task
+
+    tts_service.create_task = record_task
+
+    await run_test(
+        tts_service,
+        frames_to_send=[TTSSpeakFrame(text="Hello world."), SleepFrame(0.3), InterruptionFrame()],
+    )
+
+    receive_tasks = [t for t in tasks if "_receive_audio_frames" in t.get_name()]
+    assert len(receive_tasks) == 1
+    assert receive_tasks[0].cancelled()
+    assert receive_tasks[0] not in tts_service.task_manager.current_tasks()
+    await asyncio.wait_for(disconnected.wait(), timeout=1.0)
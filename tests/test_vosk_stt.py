@@ -0,0 +1,165 @@
+#
+# Copyright (c) 2024-2026, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Tests for VoskSTTService."""
+
+import json
+import os
+
+import pytest
+from websockets.asyncio.server import serve, unix_serve
+
+from pipecat.frames.frames import (
+    ErrorFrame,
+    InputAudioRawFrame,
+    InterimTranscriptionFrame,
+    MetricsFrame,
+    TranscriptionFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.metrics.metrics import ProcessingMetricsData, TTFBMetricsData
+from pipecat.pipeline.task import PipelineParams
+from pipecat.services.vosk.stt import VoskSTTService
+from pipecat.tests.utils import SleepFrame, run_test
+
+SAMPLE_RATE = 16000
+
+
+def audio_frame() -> InputAudioRawFrame:
+    # 20ms of 16-bit mono audio.
+    return InputAudioRawFrame(audio=b"\x01\x00" * 320, sample_rate=SAMPLE_RATE, num_channels=1)
+
+
+@pytest.mark.asyncio
+async def test_run_vosk_stt():
+    """Test audio is sent in 60ms messages and results are pushed as frames."""
+    received = []
+
+    async def handler(websocket):
+        async for message in websocket:
+            received.append(message)
+            if isinstance(message, str):
+                continue
+            num_audio_messages = len(received) - 1
+            if num_audio_messages < 3:
+                await websocket.send(json.dumps({"partial": "hello"}))
+            else:
+                await websocket.send(json.dumps({"text": "hello world"}))
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stt = VoskSTTService(uri=f"ws://127.0.0.1:{port}")
+
+        frames_to_send = [
+            *[audio_frame() for _ in range(3)],
+            SleepFrame(0.1),
+            *[audio_frame() for _ in range(3)],
+            SleepFrame(0.1),
+            audio_frame(),
+            VADUserStoppedSpeakingFrame(),
+            SleepFrame(0.1),
+        ]
+
+        expected_down_frames = [
+            *[InputAudioRawFrame] * 3,
+            InterimTranscriptionFrame,
+            *[InputAudioRawFrame] * 3,
+            InterimTranscriptionFrame,
+            InputAudioRawFrame,
+            VADUserStoppedSpeakingFrame,
+            TranscriptionFrame,
+        ]
+
+        frames_received = await run_test(
+            stt,
+            frames_to_send=frames_to_send,
+            expected_down_frames=expected_down_frames,
+        )
+
+    assert json.loads(received[0]) == {"config": {"sample_rate": SAMPLE_RATE}}
+    # Two 60ms messages and the rest flushed when the user stopped speaking.
+    assert [len(m) for m in received[1:]] == [1920, 1920, 640]
+
+    transcription = frames_received[0][-1]
+    assert transcription.text == "hello world"
+
+
+@pytest.mark.asyncio
+async def test_run_vosk_stt_unix_socket(tmp_path):
+    """Test connecting to Vosk through a Unix domain socket."""
+    received = []
+
+    async def handler(websocket):
+        async for message in websocket:
+            received.append(message)
+            if isinstance(message, bytes):
+                await websocket.send(json.dumps({"text": "hello world"}))
+
+    path = os.path.join(tmp_path, "vosk.sock")
+    async with unix_serve(handler, path):
+        stt = VoskSTTService(uri=f"unix://{path}")
+
+        await run_test(
+            stt,
+            frames_to_send=[audio_frame(), VADUserStoppedSpeakingFrame(), SleepFrame(0.1)],
+            expected_down_frames=[
+                InputAudioRawFrame,
+                VADUserStoppedSpeakingFrame,
+                TranscriptionFrame,
+            ],
+        )
+
+    assert json.loads(received[0]) == {"config": {"sample_rate": SAMPLE_RATE}}
+    assert [len(m) for m in received[1:]] == [640]
+
+
+@pytest.mark.asyncio
+async def test_run_vosk_stt_metrics():
+    """Test metrics are measured from the user stopping speaking to the final result."""
+
+    async def handler(websocket):
+        async for message in websocket:
+            if isinstance(message, bytes):
+                await websocket.send(json.dumps({"text": "hello world"}))
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stt = VoskSTTService(uri=f"ws://127.0.0.1:{port}")
+
+        frames_received = await run_test(
+            stt,
+            frames_to_send=[audio_frame(), VADUserStoppedSpeakingFrame(), SleepFrame(0.1)],
+            expected_down_frames=[
+                # Initial metrics pushed by the pipeline at start.
+                MetricsFrame,
+                InputAudioRawFrame,
+                VADUserStoppedSpeakingFrame,
+                TranscriptionFrame,
+                MetricsFrame,
+                MetricsFrame,
+            ],
+            pipeline_params=PipelineParams(enable_metrics=True),
+        )
+
+    ttfb, processing = frames_received[0][-2:]
+    assert isinstance(ttfb.data[0], TTFBMetricsData)
+    assert isinstance(processing.data[0], ProcessingMetricsData)
+
+
+@pytest.mark.asyncio
+async def test_run_vosk_stt_unreachable():
+    """Test an unreachable Vosk server is reported upstream."""
+    stt = VoskSTTService(uri="ws://127.0.0.1:1", reconnect_on_error=False)
+
+    _, up_frames = await run_test(
+        stt,
+        frames_to_send=[audio_frame(), SleepFrame(0.2)],
+        expected_down_frames=[InputAudioRawFrame],
+        # The failed connection, then the receive task giving up.
+        expected_up_frames=[ErrorFrame, ErrorFrame],
+    )
+
+    assert "Unable to connect to Vosk" in up_frames[0].error